@@ -77,12 +77,16 @@ while not state.exit:
             state.renderer.borders = not state.renderer.borders
         elif e.type == pygame.KEYDOWN and e.key == pygame.K_a:
             state.renderer.alpha -= 0.1 * pow( 10, mod ) * pow( -1, mod2 )
-            state.renderer.alpha = max( 0, min( 1, state.renderer.alpha ) )
+            state.renderer.alpha = max( 0, min( 1, round( state.renderer.alpha, 6 ) ) )
         elif e.type == pygame.KEYDOWN and e.key == pygame.K_s:
             state.renderer.shader -= pow( 8, mod ) * pow( -1, mod2 )
             state.renderer.shader = max( 1, min( 8, state.renderer.shader ) )
         elif e.type == pygame.KEYDOWN and e.unicode == 'w':
             state.renderer.wireframe = not state.renderer.wireframe
+        elif e.type == pygame.KEYDOWN and e.unicode == 'c':
+            state.renderer.culling = not state.renderer.culling
+        elif e.type == pygame.KEYDOWN and e.unicode == 'd':
+            state.renderer.lod = not state.renderer.lod
         elif e.type == pygame.KEYDOWN and e.key == pygame.K_f:
             state.simulator.friction -= 10 * pow( 10, mod ) * pow( -1, mod2 )
         elif e.type == pygame.KEYDOWN and e.key == pygame.K_r:
@@ -106,6 +110,7 @@ while not state.exit:
     text = [
         "Simulation: " + str( state.simulator.steps ),
         "Vertices: " + str( state.model.count() ),
+        "Drawn: " + str( state.renderer.drawnCount ),
         "Repulsion: " + str( round( 1000000 * state.simulator.repulsion ) ) + "uf^-2",
         "Friction: " + str( state.simulator.friction ) + "fU^-2",
         "Temperature: " + str( int( 1000000 * state.model.temperature() ) ) + "uU²f²"
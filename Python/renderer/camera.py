@@ -1,6 +1,9 @@
 import glm
 import numpy as np
 
+def columns( matrix ):
+    return np.array( [ list( column ) for column in matrix ], dtype = float )
+
 class Camera:
     def __init__( self ):
         self.resolution = None
@@ -12,12 +15,23 @@ class Camera:
         self.proj = glm.perspective( np.pi/4, width / height, 0.1, 10 )
 
     def mvp( self ):
-        return np.array( self.proj * self.view, dtype = float )
+        return columns( self.proj * self.view )
 
     def pos( self ):
         invMvp = np.linalg.inv( self.mvp() )
         return invMvp[2,:3] / invMvp[2,3]
 
+    def frustum( self ):
+        m = self.mvp().T
+        planes = np.array( [ m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2] ] )
+        return planes / np.linalg.norm( planes[:,:3], axis = 1 )[:,np.newaxis]
+
+    def clipW( self ):
+        return self.mvp().T[3]
+
+    def pixelScale( self ):
+        return self.resolution[1] / 2 * np.array( self.proj )[1,1]
+
     def rotate( self, a, b ):
         a /= np.linalg.norm( a )
         b /= np.linalg.norm( b )
@@ -76,4 +90,4 @@ class Camera:
 
     def ortho( self ):
         ortho = glm.ortho( 0, self.resolution[0], 0, self.resolution[1], 0, 1 )
-        return np.array( ortho, dtype = float )
+        return columns( ortho )
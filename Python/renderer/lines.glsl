@@ -5,6 +5,8 @@ uniform mat4 proj;
 
 uniform float sides;
 uniform int minOut;
+uniform vec2 viewport;
+uniform float segment;
 
 mat4 mvp = proj * view;
 mat4 invMvp = inverse( mvp );
@@ -18,6 +20,13 @@ void main()
 
     int lines = max( minOut, int( ceil( sides * length ) ) );
 
+    if( gl_in[0].gl_Position.w > 0 && gl_in[1].gl_Position.w > 0 ) {
+        vec2 screen0 = gl_in[0].gl_Position.xy / gl_in[0].gl_Position.w;
+        vec2 screen1 = gl_in[1].gl_Position.xy / gl_in[1].gl_Position.w;
+        float screenLength = distance( screen0 * viewport, screen1 * viewport ) / 2;
+        lines = min( lines, max( minOut, int( ceil( screenLength / segment ) ) ) );
+    }
+
     for( int i = 0; i <= lines; i++ ) {
         float a = float( i ) / float( lines );
 
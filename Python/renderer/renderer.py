@@ -53,7 +53,8 @@ class Renderer:
     def setViewport( width, height ):
         glViewport( 0, 0, width, height )
 
-    def __init__( self, points = False, links = False, voronoi = True, borders = True, alpha = 0, shader = 1, wireframe = False ):
+    def __init__( self, points = False, links = False, voronoi = True, borders = True, alpha = 0, shader = 1, wireframe = False,
+                  culling = True, lod = True, lodPixels = 3, lodMaxPixels = 16, segmentPixels = 8 ):
         self.points    = points
         self.links     = links
         self.voronoi   = voronoi
@@ -63,6 +64,14 @@ class Renderer:
         self.shader    = shader
         self.wireframe = wireframe
 
+        self.culling       = culling
+        self.lod           = lod
+        self.lodPixels     = lodPixels
+        self.lodMaxPixels  = lodMaxPixels
+        self.segmentPixels = segmentPixels
+
+        self.drawnCount = 0
+
         self.vao = glGenVertexArrays( 1 )
         self.vboVertices, self.vboDegrees = glGenBuffers( 2 )
 
@@ -74,9 +83,9 @@ class Renderer:
         self.programs = {}
         self.programs["points"] = Program( [self.shaders["vertex"]], ["view", "proj"] )
         self.programs["lines"] = Program( [self.shaders["vertex"], self.shaders["lines"]],
-                                          ["view", "proj", "sides", "minOut"] )
+                                          ["view", "proj", "sides", "minOut", "viewport", "segment"] )
         self.programs["tris"] = Program( [self.shaders["vertex"], self.shaders["tris"]],
-                                         ["view", "proj", "sides", "minOut", "alpha"],
+                                         ["view", "proj", "sides", "minOut", "viewport", "segment", "alpha"],
                                          ["degree"] )
 
     def setVertices( self, vertices ):
@@ -97,6 +106,8 @@ class Renderer:
         glUniformMatrix4fv( self.programs["tris"]["proj"], 1, False, glm.value_ptr( camera.proj ) )
         glUniform1f( self.programs["tris"]["sides"], self.shader )
         glUniform1i( self.programs["tris"]["minOut"], 1 )
+        glUniform2f( self.programs["tris"]["viewport"], *camera.resolution )
+        glUniform1f( self.programs["tris"]["segment"], self.segmentPixels )
         glUniform1f( self.programs["tris"]["alpha"], self.alpha )
 
         glPolygonMode( GL_FRONT_AND_BACK, GL_LINE if self.wireframe else GL_FILL )
@@ -122,6 +133,8 @@ class Renderer:
         glUniformMatrix4fv( self.programs["lines"]["proj"], 1, False, glm.value_ptr( camera.proj ) )
         glUniform1f( self.programs["lines"]["sides"], self.shader )
         glUniform1i( self.programs["lines"]["minOut"], 1 )
+        glUniform2f( self.programs["lines"]["viewport"], *camera.resolution )
+        glUniform1f( self.programs["lines"]["segment"], self.segmentPixels )
         
         glColor4f( 0, 0, 0, 0.2 if not self.wireframe or not self.voronoi else 1 )
         indexedBorders = np.concatenate( borders if indices is None else borders[indices] )
@@ -141,6 +154,8 @@ class Renderer:
         glUniformMatrix4fv( self.programs["lines"]["proj"], 1, False, glm.value_ptr( camera.proj ) )
         glUniform1f( self.programs["lines"]["sides"], self.shader )
         glUniform1i( self.programs["lines"]["minOut"], 2 )
+        glUniform2f( self.programs["lines"]["viewport"], *camera.resolution )
+        glUniform1f( self.programs["lines"]["segment"], self.segmentPixels )
 
         glColor4f( 0, 0, 1, 0.2 )
         indexedLinks = np.concatenate( links if indices is None else links[indices] )
@@ -164,6 +179,46 @@ class Renderer:
 
         glPointSize( 1 )
     
+    def renderAggregates( self, camera, aggregates, sizes, color ):
+        glUseProgram( self.programs['points'].id )
+        glUniformMatrix4fv( self.programs['points']['view'], 1, False, glm.value_ptr( camera.view ) )
+        glUniformMatrix4fv( self.programs['points']['proj'], 1, False, glm.value_ptr( camera.proj ) )
+
+        glColor4f( *color )
+        pointSizes = np.ceil( sizes )
+        for pointSize in np.unique( pointSizes ):
+            sized = aggregates[pointSizes == pointSize]
+            glPointSize( pointSize )
+            glDrawElements( GL_POINTS, sized.size, GL_UNSIGNED_INT, sized )
+
+        glPointSize( 1 )
+
+    @staticmethod
+    def fogsFront( camera ):
+        # mirrors the fog ramp in vertex.glsl, evaluated at the horizon circle
+        m = camera.mvp().T
+        eye = camera.pos()
+        distance = np.linalg.norm( eye )
+        if distance <= 1:
+            return False
+        fogSwitch = np.clip( 4 * m[2,3] - 3.5, 0, 1 )
+        horizonZ = m[2,:3].dot( eye / distance ** 2 ) + m[2,3]
+        return fogSwitch > 0 and horizonZ > m[2,3] - 0.3
+
+    def needsBackside( self, camera ):
+        return not self.voronoi or self.wireframe or self.alpha < 1 or self.fogsFront( camera )
+
+    def visibleCells( self, camera, model, selection = None ):
+        lod = self.lod and not ( self.wireframe or self.points or self.links )
+        if not self.culling and not lod:
+            return np.arange( model.count() ), np.empty( 0, dtype = np.int64 ), np.empty( 0 )
+
+        planes = camera.frustum() if self.culling else None
+        cullHorizon = self.culling and not self.needsBackside( camera )
+        lodPixels = self.lodPixels if lod else 0
+        return model.tree.query( planes, camera.pos(), camera.clipW(), camera.pixelScale(),
+                                 lodPixels, cullHorizon, self.lodMaxPixels, selection )
+
     def render( self, camera, model, selection = None ):
         glClearColor( 0.2, 0.4, 0.4, 1.0 )
         glClear( GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT )
@@ -171,15 +226,32 @@ class Renderer:
         glBindVertexArray( self.vao )
         glEnableClientState( GL_VERTEX_ARRAY )
 
-        depths = np.dot( model.vertices, camera.pos() )
+        cells, aggregates, aggregateSizes = self.visibleCells( camera, model, selection )
+        self.drawnCount = cells.size + aggregates.size
+
+        eye = camera.pos()
+        depths = np.dot( model.vertices[cells], eye )
         zOrder = np.argsort( depths )
         horizon = np.searchsorted( depths[zOrder], 1 )
 
-        indicesBack  = zOrder[:horizon]
-        indicesFront = zOrder[horizon:]
+        indicesBack  = cells[zOrder[:horizon]]
+        indicesFront = cells[zOrder[horizon:]]
+
+        aggregateDepths = np.dot( model.vertices[aggregates], eye )
+        aggregatesBack  = aggregates[aggregateDepths < 1], aggregateSizes[aggregateDepths < 1]
+        aggregatesFront = aggregates[aggregateDepths >= 1], aggregateSizes[aggregateDepths >= 1]
+
+        fillColor = ( 0.7, 0.7, 0.7, 0.7 + 0.3 * self.alpha )
+        borderColor = ( 0, 0, 0, 0.2 )
 
         glDepthMask( GL_FALSE )
 
+        if len( aggregatesBack[0] ) > 0:
+            if self.voronoi:
+                self.renderAggregates( camera, *aggregatesBack, fillColor )
+            if self.borders:
+                self.renderAggregates( camera, *aggregatesBack, borderColor )
+
         if len( indicesBack ) > 0:
             if self.voronoi:
                 self.renderVoronoi( camera, model.tris, indicesBack, selection )
@@ -190,6 +262,12 @@ class Renderer:
             if self.points:
                 self.renderPoints( camera, model.count(), indicesBack, selection )
 
+        if len( aggregatesFront[0] ) > 0:
+            if self.voronoi:
+                self.renderAggregates( camera, *aggregatesFront, fillColor )
+            if self.borders:
+                self.renderAggregates( camera, *aggregatesFront, borderColor )
+
         if len( indicesFront ) > 0:
             if self.voronoi:
                 glDepthMask( GL_TRUE )
@@ -5,6 +5,8 @@ uniform mat4 proj;
 
 uniform float sides;
 uniform int minOut;
+uniform vec2 viewport;
+uniform float segment;
 uniform float alpha;
 
 mat4 mvp = proj * view;
@@ -31,6 +33,13 @@ void main()
 
     int lines = max( minOut, int( ceil( sides * length ) ) );
 
+    if( gl_in[1].gl_Position.w > 0 && gl_in[2].gl_Position.w > 0 ) {
+        vec2 screen1 = gl_in[1].gl_Position.xy / gl_in[1].gl_Position.w;
+        vec2 screen2 = gl_in[2].gl_Position.xy / gl_in[2].gl_Position.w;
+        float screenLength = distance( screen1 * viewport, screen2 * viewport ) / 2;
+        lines = min( lines, max( minOut, int( ceil( screenLength / segment ) ) ) );
+    }
+
     for( int i = 1; i <= lines; i++ ) {
         gl_Position = gl_in[0].gl_Position;
         gl_FrontColor = gl_in[0].gl_FrontColor * triColor;
@@ -0,0 +1,111 @@
+import numpy as np
+
+def spreadBits( x ):
+    x = ( x | ( x << 16 ) ) & 0x030000FF
+    x = ( x | ( x << 8 ) ) & 0x0300F00F
+    x = ( x | ( x << 4 ) ) & 0x030C30C3
+    x = ( x | ( x << 2 ) ) & 0x09249249
+    return x
+
+def mortonCodes( points ):
+    quantized = np.clip( ( points + 1 ) * 512, 0, 1023 ).astype( np.int64 )
+    return spreadBits( quantized[:,0] ) | spreadBits( quantized[:,1] ) << 1 | spreadBits( quantized[:,2] ) << 2
+
+class CellTree:
+    def __init__( self, vertices, cellRadii, leafSize = 32 ):
+        self.leafSize = leafSize
+        self.order = np.argsort( mortonCodes( vertices ), kind = 'stable' )
+        self.positions = np.empty_like( self.order )
+        self.positions[self.order] = np.arange( self.order.size )
+        points = vertices[self.order]
+        pointRadii = cellRadii[self.order]
+
+        self.begins = np.arange( 0, points.shape[0], leafSize )
+        self.ends = np.append( self.begins[1:], points.shape[0] )
+        counts = self.ends - self.begins
+
+        centers = np.add.reduceat( points, self.begins ) / counts[:,np.newaxis]
+        leafIds = np.repeat( np.arange( counts.size ), counts )
+        distances = np.linalg.norm( points - centers[leafIds], axis = 1 )
+        radii = np.maximum.reduceat( distances + pointRadii, self.begins )
+        reps = self.order[np.lexsort( ( distances, leafIds ) )[self.begins]]
+
+        # levels are stored leaves first, children of node i are 2i and 2i+1 one level below
+        self.centers, self.radii, self.reps, self.counts = [centers], [radii], [reps], [counts]
+
+        while counts.size > 1:
+            if counts.size % 2:
+                centers = np.append( centers, centers[-1:], axis = 0 )
+                radii = np.append( radii, radii[-1:] )
+                reps = np.append( reps, reps[-1:] )
+                counts = np.append( counts, 0 )
+
+            weights = np.array( [ counts[0::2], counts[1::2] ], dtype = np.float32 )
+            parentCounts = counts[0::2] + counts[1::2]
+            parentCenters = ( centers[0::2] * weights[0,:,np.newaxis] + centers[1::2] * weights[1,:,np.newaxis] ) \
+                            / parentCounts[:,np.newaxis]
+
+            leftDistances = np.linalg.norm( centers[0::2] - parentCenters, axis = 1 )
+            rightDistances = np.linalg.norm( centers[1::2] - parentCenters, axis = 1 )
+            parentRadii = np.maximum( leftDistances + radii[0::2], rightDistances + radii[1::2] )
+
+            leftReps, rightReps = reps[0::2], reps[1::2]
+            leftRepDistances = np.linalg.norm( vertices[leftReps] - parentCenters, axis = 1 )
+            rightRepDistances = np.linalg.norm( vertices[rightReps] - parentCenters, axis = 1 )
+            parentReps = np.where( leftRepDistances <= rightRepDistances, leftReps, rightReps )
+
+            centers, radii, reps, counts = parentCenters, parentRadii, parentReps, parentCounts
+            self.centers.append( centers )
+            self.radii.append( radii )
+            self.reps.append( reps )
+            self.counts.append( counts )
+
+    def cellsUnder( self, level, nodes ):
+        begins = self.begins[nodes << level]
+        ends = self.ends[np.minimum( ( nodes + 1 ) << level, self.begins.size ) - 1]
+        counts = ends - begins
+        offsets = np.repeat( begins - np.cumsum( counts ) + counts, counts )
+        return self.order[offsets + np.arange( counts.sum() )]
+
+    def traverse( self, planes, eye, wPlane, pixelScale, lodPixels = 0, cullHorizon = False, maxPixels = np.inf, keep = None ):
+        eyeDistance = np.linalg.norm( eye )
+        aggregates = []
+        frontier = np.arange( self.centers[-1].shape[0] )
+        keepLeaf = -1 if keep is None else self.positions[keep] // self.leafSize
+
+        for level in reversed( range( len( self.centers ) ) ):
+            centers = self.centers[level][frontier]
+            radii = self.radii[level][frontier]
+
+            visible = np.ones( frontier.size, dtype = bool )
+            if planes is not None:
+                visible &= ( centers.dot( planes[:,:3].T ) + planes[:,3] >= -radii[:,np.newaxis] ).all( axis = 1 )
+            if cullHorizon and eyeDistance > 1:
+                visible &= centers.dot( eye ) + radii * eyeDistance >= 1
+
+            frontier, centers, radii = frontier[visible], centers[visible], radii[visible]
+
+            if lodPixels > 0:
+                w = centers.dot( wPlane[:3] ) + wPlane[3]
+                sizes = np.where( w > 0, 2 * radii * pixelScale / np.maximum( w, 1e-6 ), np.inf )
+                small = ( sizes < lodPixels * np.sqrt( self.counts[level][frontier] ) ) & ( sizes <= maxPixels )
+                if keepLeaf >= 0:
+                    small &= frontier != keepLeaf >> level
+                aggregates.append( ( level, frontier[small], sizes[small] ) )
+                frontier = frontier[~small]
+
+            if level > 0:
+                children = np.concatenate( ( 2 * frontier, 2 * frontier + 1 ) )
+                frontier = np.sort( children[children < self.centers[level - 1].shape[0]] )
+
+        return frontier, aggregates
+
+    def query( self, planes, eye, wPlane, pixelScale, lodPixels = 0, cullHorizon = False, maxPixels = np.inf, keep = None ):
+        leaves, aggregates = self.traverse( planes, eye, wPlane, pixelScale, lodPixels, cullHorizon, maxPixels, keep )
+        cells = self.cellsUnder( 0, leaves )
+
+        if not aggregates:
+            return cells, np.empty( 0, dtype = cells.dtype ), np.empty( 0 )
+        reps = np.concatenate( [ self.reps[level][nodes] for level, nodes, _ in aggregates ] )
+        sizes = np.concatenate( [ sizes for _, _, sizes in aggregates ] )
+        return cells, reps, sizes
@@ -2,6 +2,8 @@ import numpy as np
 
 from scipy.spatial import SphericalVoronoi
 
+from simulator.celltree import CellTree
+
 class Model:
     @staticmethod
     def arrangedPointsOnSphere( n ):
@@ -112,8 +114,17 @@ class Model:
             self.tris[i] = tris
             self.borders[i] = borders
 
+    def _updateTree( self ):
+        regionSizes = np.fromiter( map( len, self.sv.regions ), np.int64, len( self.sv.regions ) )
+        regionVertices = np.concatenate( self.sv.regions )
+        owners = np.repeat( np.arange( regionSizes.size ), regionSizes )
+        distances = np.linalg.norm( self.sv.vertices[regionVertices] - self.vertices[owners], axis = 1 )
+        self.cellRadii = np.maximum.reduceat( distances, np.cumsum( regionSizes ) - regionSizes )
+        self.tree = CellTree( self.vertices, self.cellRadii )
+
     def updateGeometry( self ):
         self._updateSV()
         self._updateVertices()
         self._updateLinks()
         self._updateBordersAndTris()
+        self._updateTree()
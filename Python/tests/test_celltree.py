@@ -0,0 +1,102 @@
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert( 0, str( Path( __file__ ).parents[1] ) )
+
+from renderer.camera import Camera
+from simulator.celltree import CellTree
+
+def makeCamera( zoom = 0, rotation = None ):
+    camera = Camera()
+    camera.setResolution( 800, 600 )
+    camera.zoom( zoom )
+    if rotation is not None:
+        camera.rotate( np.array( [ 0, 0, 1. ] ), np.array( rotation, dtype = float ) )
+    return camera
+
+def makeTree( n, seed = 0 ):
+    rng = np.random.default_rng( seed )
+    vertices = rng.normal( size = ( n, 3 ) ).astype( np.float32 )
+    vertices /= np.linalg.norm( vertices, axis = 1 )[:,np.newaxis]
+    cellRadii = rng.uniform( 0.5, 2, n ).astype( np.float32 ) / np.sqrt( n )
+    return vertices, cellRadii, CellTree( vertices, cellRadii )
+
+def query( tree, camera, **kwargs ):
+    return tree.query( camera.frustum(), camera.pos(), camera.clipW(), camera.pixelScale(), **kwargs )
+
+def test_camera_frustum_matches_view():
+    camera = makeCamera()
+    planes = camera.frustum()
+    assert np.allclose( camera.pos(), [ 0, 0, 3 ] )
+    assert ( planes[:,:3].dot( [ 0, 0, 1 ] ) + planes[:,3] > 0 ).all()
+    assert ( planes[:,:3].dot( [ 5, 0, 0 ] ) + planes[:,3] < 0 ).any()
+    assert ( planes[:,:3].dot( [ 0, 0, 4 ] ) + planes[:,3] < 0 ).any()
+    assert np.isclose( camera.clipW().dot( [ 0, 0, 0, 1 ] ), 3 )
+
+def test_query_without_lod_returns_superset_of_visible_cells():
+    vertices, cellRadii, tree = makeTree( 5000 )
+    for camera in [ makeCamera( -10, [ 1, 1, 0 ] ), makeCamera( 0, [ 0, -1, 1 ] ), makeCamera( 11, [ -1, 0, 0 ] ) ]:
+        planes, eye = camera.frustum(), camera.pos()
+        for cullHorizon in [ False, True ]:
+            cells, aggregates, _ = query( tree, camera, cullHorizon = cullHorizon )
+
+            assert aggregates.size == 0
+            assert np.unique( cells ).size == cells.size
+
+            visible = ( vertices.dot( planes[:,:3].T ) + planes[:,3] >= -cellRadii[:,np.newaxis] ).all( axis = 1 )
+            if cullHorizon:
+                visible &= vertices.dot( eye ) + cellRadii * np.linalg.norm( eye ) >= 1
+                assert cells.size < vertices.shape[0]
+            assert visible.any()
+            assert np.isin( np.flatnonzero( visible ), cells ).all()
+
+def test_query_without_planes_returns_every_cell():
+    vertices, _, tree = makeTree( 1000 )
+    camera = makeCamera()
+    cells, _, _ = tree.query( None, camera.pos(), camera.clipW(), camera.pixelScale() )
+    assert np.array_equal( np.sort( cells ), np.arange( vertices.shape[0] ) )
+
+def test_query_inside_sphere_ignores_horizon():
+    vertices, cellRadii, tree = makeTree( 1000 )
+    camera = makeCamera( -15 )
+    assert np.linalg.norm( camera.pos() ) < 1
+
+    cells, _, _ = tree.query( None, camera.pos(), camera.clipW(), camera.pixelScale(), cullHorizon = True )
+    assert np.array_equal( np.sort( cells ), np.arange( vertices.shape[0] ) )
+
+    planes = camera.frustum()
+    cells, _, _ = query( tree, camera, cullHorizon = True )
+    visible = ( vertices.dot( planes[:,:3].T ) + planes[:,3] >= -cellRadii[:,np.newaxis] ).all( axis = 1 )
+    assert visible.any()
+    assert np.isin( np.flatnonzero( visible ), cells ).all()
+
+def test_lod_covers_visible_cells_exactly():
+    _, _, tree = makeTree( 20000 )
+    camera = makeCamera( 11, [ 0, 1, 1 ] )
+    args = ( camera.frustum(), camera.pos(), camera.clipW(), camera.pixelScale() )
+
+    for cullHorizon in [ False, True ]:
+        visible, _, _ = tree.query( *args, cullHorizon = cullHorizon )
+        leaves, aggregates = tree.traverse( *args, lodPixels = 3, cullHorizon = cullHorizon, maxPixels = 16 )
+        assert sum( nodes.size for _, nodes, _ in aggregates ) > 0
+
+        covered = [ tree.cellsUnder( 0, leaves ) ] + [ tree.cellsUnder( level, nodes ) for level, nodes, _ in aggregates ]
+        covered = np.concatenate( covered )
+        assert np.unique( covered ).size == covered.size
+        assert np.array_equal( np.sort( covered ), np.sort( visible ) )
+
+        cells, reps, sizes = tree.query( *args, lodPixels = 3, cullHorizon = cullHorizon, maxPixels = 16 )
+        assert np.array_equal( np.sort( cells ), np.sort( tree.cellsUnder( 0, leaves ) ) )
+        assert reps.size == sizes.size > 0
+        assert ( sizes <= 16 ).all()
+
+def test_query_keeps_selection_out_of_aggregates():
+    _, _, tree = makeTree( 20000 )
+    camera = makeCamera( 11 )
+    cells, aggregates, _ = query( tree, camera, lodPixels = 3 )
+    assert aggregates.size > 0
+
+    selection = aggregates[0]
+    cells, aggregates, _ = query( tree, camera, lodPixels = 3, keep = selection )
+    assert selection in cells